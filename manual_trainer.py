@@ -10,33 +10,63 @@ Usage:
 Hotkeys:
     Ctrl+Return  -> Save sample
     Ctrl+Shift+R -> Retrain model immediately
+
+Speech is transcribed offline with Vosk when a model is available at
+VOSK_MODEL_PATH; otherwise Google Web Speech is used.
 """
 
 from __future__ import annotations
 
 import json
+import os
 import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-import speech_recognition as sr
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from ml.intent_classifier import (
-    INTENT_LABELS,
-    IntentClassifier,
-    load_dataset,
-    save_dataset,
-    train_pipeline,
-)
+from ml.labels import INTENT_LABELS
+
+if TYPE_CHECKING:
+    from ml.intent_classifier import IntentClassifier
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # orjson is optional; fall back to the stdlib encoder.
+    _loads = json.loads
+
+    def _dumps(record: dict) -> bytes:
+        return json.dumps(record, separators=(",", ":")).encode("utf-8")
 
 WINDOW_TITLE = "Pro Calculator Voice Trainer"
-EXPRESSION_PAIRS_PATH = Path(__file__).resolve().parent / "ml" / "data" / "voice_expression_pairs.json"
+EXPRESSION_PAIRS_PATH = Path(__file__).resolve().parent / "ml" / "data" / "voice_expression_pairs.jsonl"
+# Older versions stored every pair in a single JSON array; merged in on load.
+LEGACY_EXPRESSION_PAIRS_PATH = EXPRESSION_PAIRS_PATH.with_suffix(".json")
+EXPRESSION_PAIRS_FLUSH_EVERY = 8
+VOSK_MODEL_PATH = Path(
+    os.getenv("VOSK_MODEL_PATH", Path(__file__).resolve().parent / "models" / "vosk-model-small-en-us-0.15")
+)
+_SORTED_LABELS = tuple(sorted(INTENT_LABELS))
+_INTENT_LABEL_SET = frozenset(INTENT_LABELS)
+_LABEL_CSV = ", ".join(_SORTED_LABELS)
 
+_INTENT_MODEL: Optional["IntentClassifier"] = None
+_INTENT_MODEL_LOCK = threading.Lock()
 
-def _sorted_labels() -> List[str]:
-    return sorted(INTENT_LABELS)
+
+def _get_intent_model() -> "IntentClassifier":
+    """Return the process-wide classifier so reopening the trainer skips reloading it."""
+    global _INTENT_MODEL
+    with _INTENT_MODEL_LOCK:
+        if _INTENT_MODEL is None:
+            from ml.intent_classifier import IntentClassifier
+
+            _INTENT_MODEL = IntentClassifier()
+        return _INTENT_MODEL
 
 
 class TrainerApp:
@@ -46,25 +76,102 @@ class TrainerApp:
         self.root.geometry("720x520")
         self.root.minsize(640, 480)
 
-        self.recognizer = sr.Recognizer()
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.pause_threshold = 0.6
-        self.intent_model = IntentClassifier()
+        # Speech recognition and the intent model load in _lazy_init_ml once the window is up.
+        self.recognizer = None
+        self.microphone = None
+        self.microphone_error: Optional[str] = None
+        self.intent_model = None
+        self._vosk_model = None
+        self._ml_ready = False
+        self._mic_lock = threading.Lock()
+        self._calibrated = False
+        self._listen_lock = threading.Lock()
+        self._capture_event = threading.Event()
         self.pending_sample: Optional[str] = None
         self.listening = False
-        try:
-            self.microphone = sr.Microphone()
-            self.microphone_error: Optional[str] = None
-        except Exception as exc:  # Microphone not available
-            self.microphone = None
-            self.microphone_error = str(exc)
-
-        self.samples = load_dataset()
-        self.expression_pairs = self._load_expression_pairs()
+        self._retraining = False
+        self._close_requested = False
+        self._next_iid = 0
+        self._dirty = False
+        self._flush_job: Optional[str] = None
+        self._pending_snapshot: Optional[List[dict]] = None
+        self._save_lock = threading.Lock()
+
+        self.samples_by_id: Dict[str, dict] = {}
+        EXPRESSION_PAIRS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # Pairs are only ever appended, so existing ones are never read back.
+        if LEGACY_EXPRESSION_PAIRS_PATH.exists():
+            self._migrate_legacy_expression_pairs()
+        self._pending_pairs: List[dict] = []
 
         self._build_layout()
-        self._populate_table()
         self._bind_shortcuts()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        threading.Thread(target=self._lazy_init_ml, daemon=True).start()
+        threading.Thread(target=self._capture_loop, daemon=True).start()
+        threading.Thread(target=self._load_vosk_model, daemon=True).start()
+
+    def _lazy_init_ml(self) -> None:
+        try:
+            import speech_recognition as sr
+
+            from ml.intent_classifier import load_dataset
+
+            self.recognizer = sr.Recognizer()
+            self.recognizer.dynamic_energy_threshold = True
+            self.recognizer.pause_threshold = 0.6
+            try:
+                self.microphone = sr.Microphone()
+            except Exception as exc:  # Microphone not available
+                self.microphone = None
+                self.microphone_error = str(exc)
+            self.intent_model = _get_intent_model()
+            samples = load_dataset()
+        except Exception as exc:
+            self.root.after(0, self.status_var.set, f"Unable to load voice model: {exc}")
+            return
+        self.root.after(0, self._on_ml_ready, samples)
+        # Pay the first-inference cost now rather than on the first voice sample.
+        threading.Thread(target=self.intent_model.interpret, args=("warmup",), daemon=True).start()
+        if self.microphone is not None:
+            self._calibrate_microphone()
+
+    def _load_vosk_model(self) -> None:
+        if not VOSK_MODEL_PATH.exists():
+            return
+        try:
+            from vosk import Model
+
+            self._vosk_model = Model(str(VOSK_MODEL_PATH))
+        except Exception:
+            self._vosk_model = None  # Vosk is optional; Google Web Speech remains the fallback.
+
+    def _calibrate_microphone(self) -> None:
+        # Calibrate once up front; dynamic_energy_threshold keeps adapting while listening.
+        with self._mic_lock:
+            if self._calibrated:
+                return
+            try:
+                with self.microphone as source:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=1.0)
+            except Exception:
+                return  # Retried by the first capture.
+            self._calibrated = True
+
+    def _on_ml_ready(self, samples: List[dict]) -> None:
+        self._ml_ready = True
+        self._populate_table(samples)
+        if self.microphone is None:
+            self.voice_status_var.set(f"Mic unavailable: {self.microphone_error}")
+        else:
+            self.voice_status_var.set("Mic idle")
+            self.listen_button.config(state=tk.NORMAL)
+        self.status_var.set("Dataset loaded")
+
+    def _ensure_ml_ready(self) -> bool:
+        if not self._ml_ready:
+            self.status_var.set("Voice model still loading…")
+        return self._ml_ready
 
     # ------------------------------------------------------------------
     def _build_layout(self) -> None:
@@ -81,8 +188,8 @@ class TrainerApp:
         self.text_entry.focus_set()
 
         ttk.Label(form, text="Intent label:").grid(row=1, column=0, sticky=tk.W, pady=(6, 0))
-        self.label_var = tk.StringVar(value=_sorted_labels()[0])
-        self.label_combo = ttk.Combobox(form, textvariable=self.label_var, values=_sorted_labels(), state="readonly")
+        self.label_var = tk.StringVar(value=_SORTED_LABELS[0])
+        self.label_combo = ttk.Combobox(form, textvariable=self.label_var, values=_SORTED_LABELS, state="readonly")
         self.label_combo.grid(row=1, column=1, sticky=tk.W, padx=6, pady=(6, 0))
 
         ttk.Label(form, text="Expression (calculator):").grid(row=2, column=0, sticky=tk.W, pady=(6, 0))
@@ -96,20 +203,16 @@ class TrainerApp:
 
         controls = ttk.Frame(voice_frame)
         controls.grid(row=0, column=0, sticky=tk.W)
-        self.listen_button = ttk.Button(controls, text="🎙️ Start listening", command=self.start_listening)
+        self.listen_button = ttk.Button(controls, text="🎙️ Start listening", command=self.start_listening, state=tk.DISABLED)
         self.listen_button.pack(side=tk.LEFT)
         self.accept_button = ttk.Button(controls, text="✓ Tick", command=self.accept_voice_sample, state=tk.DISABLED)
         self.accept_button.pack(side=tk.LEFT, padx=(6, 0))
         self.correct_button = ttk.Button(controls, text="✏️ Make change", command=self.enable_correction, state=tk.DISABLED)
         self.correct_button.pack(side=tk.LEFT, padx=(6, 0))
 
-        self.voice_status_var = tk.StringVar(value="Mic idle")
+        self.voice_status_var = tk.StringVar(value="Preparing microphone…")
         ttk.Label(voice_frame, textvariable=self.voice_status_var).grid(row=0, column=1, sticky=tk.E)
 
-        if self.microphone is None:
-            self.voice_status_var.set(f"Mic unavailable: {self.microphone_error}")
-            self.listen_button.config(state=tk.DISABLED)
-
         button_frame = ttk.Frame(form)
         button_frame.grid(row=4, column=0, columnspan=2, pady=(10, 0), sticky=tk.E)
 
@@ -144,7 +247,7 @@ class TrainerApp:
         self.retrain_button = ttk.Button(actions, text="Retrain model", command=self.retrain_model)
         self.retrain_button.pack(side=tk.RIGHT)
 
-        self.status_var = tk.StringVar(value="Dataset loaded")
+        self.status_var = tk.StringVar(value="Loading voice model…")
         status_bar = ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W, padding=(8, 4))
         status_bar.pack(fill=tk.X, side=tk.BOTTOM)
 
@@ -153,38 +256,102 @@ class TrainerApp:
         self.root.bind("<Control-Shift-R>", lambda _: self.retrain_model())
 
     # ------------------------------------------------------------------
-    def _load_expression_pairs(self) -> List[dict]:
-        EXPRESSION_PAIRS_PATH.parent.mkdir(parents=True, exist_ok=True)
-        if not EXPRESSION_PAIRS_PATH.exists():
-            EXPRESSION_PAIRS_PATH.write_text("[]", encoding="utf-8")
-        with EXPRESSION_PAIRS_PATH.open("r", encoding="utf-8") as handle:
-            try:
-                return json.load(handle)
-            except json.JSONDecodeError:
-                return []
+    def _migrate_legacy_expression_pairs(self) -> None:
+        # Appended rather than only run when the .jsonl is missing: the .jsonl
+        # is tracked, so an updated checkout already has one next to old pairs.
+        try:
+            records = _loads(LEGACY_EXPRESSION_PAIRS_PATH.read_bytes())
+        except ValueError:
+            # Leave an unreadable file in place rather than lose its pairs.
+            return
+        with EXPRESSION_PAIRS_PATH.open("ab") as handle:
+            handle.write(b"".join(_dumps(record) + b"\n" for record in records))
+        LEGACY_EXPRESSION_PAIRS_PATH.unlink()
 
     def _append_expression_pair(self, transcript: str, expression: str) -> None:
         if not expression:
             return
         record = {"transcript": transcript, "expression": expression}
-        self.expression_pairs.append(record)
-        EXPRESSION_PAIRS_PATH.parent.mkdir(parents=True, exist_ok=True)
-        EXPRESSION_PAIRS_PATH.write_text(json.dumps(self.expression_pairs, indent=2), encoding="utf-8")
+        self._pending_pairs.append(record)
+        if len(self._pending_pairs) >= EXPRESSION_PAIRS_FLUSH_EVERY:
+            self._flush_expression_pairs()
+
+    def _flush_expression_pairs(self) -> None:
+        if not self._pending_pairs:
+            return
+        # JSON Lines: buffered records are appended in one write instead of rewriting the file.
+        with EXPRESSION_PAIRS_PATH.open("ab") as handle:
+            handle.write(b"".join(_dumps(record) + b"\n" for record in self._pending_pairs))
+        self._pending_pairs.clear()
+
+    def _schedule_flush(self) -> None:
+        """Mark the dataset dirty and coalesce writes made within a short window."""
+        self._dirty = True
+        if self._flush_job is not None:
+            self.root.after_cancel(self._flush_job)
+        self._flush_job = self.root.after(500, self._flush_dataset)
+
+    def _flush_dataset(self) -> None:
+        self._flush_job = None
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._pending_snapshot = list(self.samples_by_id.values())
+        threading.Thread(target=self._write_pending_snapshot, daemon=True).start()
+
+    def _write_pending_snapshot(self) -> None:
+        # Whoever takes the lock writes the newest snapshot, so writes never go out of order.
+        with self._save_lock:
+            snapshot, self._pending_snapshot = self._pending_snapshot, None
+            if snapshot is not None:
+                from ml.intent_classifier import save_dataset
+
+                save_dataset(snapshot)
+
+    def _on_close(self) -> None:
+        if self._retraining:
+            # Exiting would kill the training thread, possibly mid-save; close
+            # from _on_retrain_done instead.
+            self._close_requested = True
+            self.status_var.set("Finishing training…")
+            return
+        if self._flush_job is not None:
+            self.root.after_cancel(self._flush_job)
+            self._flush_job = None
+        if self._dirty:
+            self._dirty = False
+            self._pending_snapshot = list(self.samples_by_id.values())
+        # Runs synchronously so pending edits (and any in-flight write) land before exit.
+        self._write_pending_snapshot()
+        self._flush_expression_pairs()
+        self.root.destroy()
 
     def _set_text_entry_state(self, readonly: bool) -> None:
         state = "readonly" if readonly else tk.NORMAL
         self.text_entry.configure(state=state)
 
     # ------------------------------------------------------------------
-    def _populate_table(self) -> None:
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        for idx, sample in enumerate(self.samples):
-            self.tree.insert("", tk.END, iid=str(idx), values=(sample["text"], sample["label"]))
+    def _populate_table(self, samples: List[dict]) -> None:
+        # Unmap the tree during the bulk insert so Tk lays it out once instead of per row.
+        self.tree.pack_forget()
+        try:
+            self.tree.delete(*self.tree.get_children())
+            self.samples_by_id.clear()
+            for sample in samples:
+                self._insert_row(sample)
+        finally:
+            self.tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
+
+    def _insert_row(self, sample: dict) -> None:
+        # Samples are keyed by a counter-based row id, so deleting one never renumbers the rest.
+        iid = str(self._next_iid)
+        self._next_iid += 1
+        self.samples_by_id[iid] = sample
+        self.tree.insert("", tk.END, iid=iid, values=(sample["text"], sample["label"]))
 
     def _clear_form(self) -> None:
         self.text_var.set("")
-        self.label_var.set(_sorted_labels()[0])
+        self.label_var.set(_SORTED_LABELS[0])
         self.text_entry.focus_set()
         self.pending_sample = None
         self.accept_button.config(state=tk.DISABLED)
@@ -195,19 +362,23 @@ class TrainerApp:
         self._set_text_entry_state(False)
 
     def add_sample(self) -> None:
+        if not self._ensure_ml_ready():
+            return
         text = self.text_var.get().strip()
         label = self.label_var.get().strip()
 
+        # Recoverable input problems go to the status bar; modal dialogs would block the Tk loop.
         if not text:
-            messagebox.showwarning("Missing text", "Please provide the transcribed text for the sample.")
+            self.status_var.set("⚠ Please provide the transcribed text for the sample.")
+            self.text_entry.focus_set()
             return
-        if label not in INTENT_LABELS:
-            messagebox.showerror("Invalid label", f"Choose one of: {', '.join(INTENT_LABELS)}")
+        if label not in _INTENT_LABEL_SET:
+            self.status_var.set(f"⚠ Invalid label. Choose one of: {_LABEL_CSV}")
+            self.label_combo.focus_set()
             return
 
-        self.samples.append({"text": text, "label": label})
-        save_dataset(self.samples)
-        self._populate_table()
+        self._insert_row({"text": text, "label": label})
+        self._schedule_flush()
         self._clear_form()
         self.status_var.set(f"Added sample for label '{label}'.")
 
@@ -236,61 +407,117 @@ class TrainerApp:
     def delete_selected(self) -> None:
         selection = self.tree.selection()
         if not selection:
-            messagebox.showinfo("No selection", "Select a row to delete from the dataset.")
+            self.status_var.set("Select a row to delete from the dataset.")
             return
 
-        idx = int(selection[0])
-        sample = self.samples.pop(idx)
-        save_dataset(self.samples)
-        self._populate_table()
+        sample = self.samples_by_id.pop(selection[0])
+        self.tree.delete(selection[0])
+        self._schedule_flush()
         self.status_var.set(f"Removed sample '{sample['text'][:32]}…'.")
 
     def retrain_model(self) -> None:
+        if self._retraining or not self._ensure_ml_ready():
+            return
+        self._retraining = True
+        self.retrain_button.config(state=tk.DISABLED)
+        self.status_var.set("Training…")
+        # Train on an immutable snapshot so edits made while the model fits can't race with it.
+        snapshot = tuple({"text": s["text"], "label": s["label"]} for s in self.samples_by_id.values())
+        threading.Thread(target=self._retrain_worker, args=(snapshot,), daemon=True).start()
+
+    def _retrain_worker(self, samples: Tuple[dict, ...]) -> None:
+        error: Optional[Exception] = None
         try:
-            train_pipeline(self.samples, persist=True)
+            # Also swaps the fresh pipeline into the shared classifier, so voice
+            # captures use it right away.
+            self.intent_model.retrain(samples)
         except Exception as exc:
-            messagebox.showerror("Training failed", f"Unable to train model: {exc}")
+            error = exc
+        self.root.after(0, self._on_retrain_done, error)
+
+    def _on_retrain_done(self, error: Optional[Exception]) -> None:
+        self._retraining = False
+        if self._close_requested:
+            self._on_close()
+            return
+        self.retrain_button.config(state=tk.NORMAL)
+        if error is not None:
+            self.status_var.set("Training failed.")
+            messagebox.showerror("Training failed", f"Unable to train model: {error}")
             return
         self.status_var.set("Model retrained and saved.")
 
     # ------------------------------------------------------------------
     def start_listening(self) -> None:
-        if self.listening or self.microphone is None:
+        if self.microphone is None:
             return
-        self.listening = True
-        self.voice_status_var.set("Calibrating microphone…")
+        with self._listen_lock:
+            if self.listening:
+                return
+            self.listening = True
+        self.voice_status_var.set("Listening…" if self._calibrated else "Calibrating microphone…")
         self.listen_button.config(state=tk.DISABLED)
-        threading.Thread(target=self._capture_voice_worker, daemon=True).start()
+        self._capture_event.set()
+
+    def _capture_loop(self) -> None:
+        # One long-lived worker serves every capture request signalled by start_listening.
+        while True:
+            self._capture_event.wait()
+            self._capture_event.clear()
+            try:
+                self._capture_voice_worker()
+            except Exception as exc:
+                # Keep serving captures; _on_voice_error also re-enables Start.
+                self.root.after(0, self._on_voice_error, f"Voice error: {exc}")
 
     def _capture_voice_worker(self) -> None:
+        import speech_recognition as sr
+
         try:
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1.0)
+            with self._mic_lock, self.microphone as source:
+                if not self._calibrated:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=1.0)
+                    self._calibrated = True
                 self.root.after(0, lambda: self.voice_status_var.set("Listening…"))
                 audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=7)
         except sr.WaitTimeoutError:
-            self.root.after(0, lambda: self._on_voice_error("No speech detected."))
+            self.root.after(0, self._on_voice_error, "No speech detected.")
             return
         except Exception as exc:
-            self.root.after(0, lambda: self._on_voice_error(f"Mic error: {exc}"))
+            self.root.after(0, self._on_voice_error, f"Mic error: {exc}")
             return
 
         try:
-            transcript = self.recognizer.recognize_google(audio)
+            transcript = self._transcribe(audio)
         except sr.UnknownValueError:
-            self.root.after(0, lambda: self._on_voice_error("Could not understand, try again."))
+            self.root.after(0, self._on_voice_error, "Could not understand, try again.")
             return
         except sr.RequestError as exc:
-            self.root.after(0, lambda: self._on_voice_error(f"Speech service error: {exc}"))
+            self.root.after(0, self._on_voice_error, f"Speech service error: {exc}")
             return
 
         result = self.intent_model.interpret(transcript)
-        label = result.intent if result.intent in INTENT_LABELS else "expression"
+        label = result.intent if result.intent in _INTENT_LABEL_SET else "expression"
         confidence = result.confidence
         display_text = transcript.strip()
         expression = result.expression or display_text
 
-        self.root.after(0, lambda: self._on_voice_result(display_text, label, confidence, expression))
+        self.root.after(0, self._on_voice_result, display_text, label, confidence, expression)
+
+    def _transcribe(self, audio) -> str:
+        """Transcribe locally with Vosk when loaded, falling back to Google Web Speech."""
+        if self._vosk_model is not None:
+            try:
+                from vosk import KaldiRecognizer
+
+                recognizer = KaldiRecognizer(self._vosk_model, 16000)
+                recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=16000, convert_width=2))
+                transcript = json.loads(recognizer.FinalResult()).get("text", "")
+            except Exception:
+                transcript = ""
+            if transcript:
+                return transcript
+        return self.recognizer.recognize_google(audio)
 
     def _on_voice_result(self, transcript: str, label: str, confidence: float, expression: Optional[str]) -> None:
         self.listening = False
@@ -300,7 +527,7 @@ class TrainerApp:
         self.pending_sample = transcript
 
         self.text_var.set(transcript)
-        if label in INTENT_LABELS:
+        if label in _INTENT_LABEL_SET:
             self.label_var.set(label)
 
         if expression:
@@ -332,10 +559,10 @@ class TrainerApp:
             entries.append({"text": expression, "label": "expression"})
         if not entries:
             return
-        self.samples.extend(entries)
-        save_dataset(self.samples)
+        for entry in entries:
+            self._insert_row(entry)
+        self._schedule_flush()
         self._append_expression_pair(transcript, expression)
-        self._populate_table()
 
     def run(self) -> None:
         self.root.mainloop()
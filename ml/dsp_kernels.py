@@ -0,0 +1,52 @@
+"""Signal statistics for the voice service's energy gate.
+
+When numba is installed the kernel is compiled to a single native loop over the
+PCM samples; otherwise an equivalent NumPy implementation is used.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+
+def _rms_numpy(samples: np.ndarray, offset: float, scale: float) -> float:
+    if not samples.size:
+        return 0.0
+    # float64 lets np.dot use BLAS and stays exact for 16-bit-scale samples.
+    wide = samples.astype(np.float64)
+    if offset:
+        wide -= offset
+    if scale != 1.0:
+        wide *= scale
+    return math.sqrt(float(np.dot(wide, wide)) / wide.size)
+
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy version is the fallback.
+    _rms_native = None
+else:
+
+    @njit(cache=True, fastmath=True)
+    def _rms_native(samples, offset, scale):  # pragma: no cover - needs numba
+        n = samples.size
+        if n == 0:
+            return 0.0
+        total = 0.0
+        for i in range(n):
+            value = (samples[i] - offset) * scale
+            total += value * value
+        return math.sqrt(total / n)
+
+
+def rms(samples: np.ndarray, offset: float = 0.0, scale: float = 1.0) -> float:
+    """Return the RMS amplitude of ``(samples - offset) * scale``.
+
+    ``offset`` re-centres unsigned PCM and ``scale`` maps other sample widths onto
+    the 16-bit range.
+    """
+    if _rms_native is not None:
+        return _rms_native(samples, float(offset), float(scale))
+    return _rms_numpy(samples, offset, scale)
@@ -9,30 +9,36 @@ speech into calculator-friendly math expressions.
 from __future__ import annotations
 
 import asyncio
+import functools
+import itertools
 import json
+import os
 import re
+import threading
+from concurrent.futures import Future
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
 import joblib
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+
+from ml.labels import INTENT_LABELS
+
+try:
+    import orjson
+except ImportError:  # Optional accelerator; the stdlib json module is the fallback.
+    orjson = None
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
 DATA_FILE = DATA_DIR / "voice_intent_dataset.json"
 MODEL_FILE = DATA_DIR / "intent_model.joblib"
-
-# Public list of supported intents; used by both the voice service and trainer UI.
-INTENT_LABELS: Tuple[str, ...] = (
-    "expression",
-    "calculate",
-    "clear",
-    "backspace",
-    "stop",
-    "noop",
-)
+# Startup training and an explicit retrain may both persist the model.
+_MODEL_FILE_LOCK = threading.Lock()
 
 # Default training corpus used to bootstrap the intent classifier the first time.
 DEFAULT_DATASET: List[Dict[str, str]] = [
@@ -131,7 +137,9 @@ def number_to_words(value: int) -> str:
     return str(value)
 
 
-def synthetic_expression_corpus() -> List[Dict[str, str]]:
+@functools.lru_cache(maxsize=1)
+def synthetic_expression_corpus() -> Tuple[Dict[str, str], ...]:
+    """Return the generated expression phrases (cached; treat the result as read-only)."""
     numbers = [
         3,
         4,
@@ -171,85 +179,78 @@ def synthetic_expression_corpus() -> List[Dict[str, str]]:
 
     modulus_numbers = [19, 23, 36, 53, 64, 75]
     triple_numbers = numbers[:10]
-    phrases: Dict[str, Dict[str, str]] = {}
-
-    def add_phrase(text: str) -> None:
-        cleaned = text.strip()
-        if not cleaned:
-            return
-        key = cleaned.lower()
-        if key not in phrases:
-            phrases[key] = {"text": cleaned, "label": "expression"}
-
-    for a in numbers:
-        for b in numbers:
-            words_a = number_to_words(a)
-            words_b = number_to_words(b)
-            add_phrase(f"{words_a} plus {words_b}")
-            add_phrase(f"add {words_a} to {words_b}")
-            add_phrase(f"sum of {words_a} and {words_b}")
-            add_phrase(f"{words_a} minus {words_b}")
-            add_phrase(f"subtract {words_b} from {words_a}")
-            add_phrase(f"take away {words_b} from {words_a}")
-            add_phrase(f"{words_a} times {words_b}")
-            add_phrase(f"{words_a} multiply by {words_b}")
-            add_phrase(f"product of {words_a} and {words_b}")
-            add_phrase(f"{words_a} divided by {words_b}")
-            add_phrase(f"divide {words_a} by {words_b}")
-            add_phrase(f"{words_a} over {words_b}")
-            add_phrase(f"{words_a} mod {words_b}")
-            add_phrase(f"modulus of {words_a} and {words_b}")
-            add_phrase(f"{a} + {b}")
-            add_phrase(f"{a} - {b}")
-            add_phrase(f"{a} * {b}")
-            add_phrase(f"{a} / {b}")
-
-    for a in modulus_numbers:
-        for b in range(2, 12):
-            words_a = number_to_words(a)
-            words_b = number_to_words(b)
-            add_phrase(f"remainder when {words_a} is divided by {words_b}")
-            add_phrase(f"what's the remainder if {words_a} is divided by {words_b}")
-            add_phrase(f"{a} % {b}")
-
-    for a in triple_numbers:
-        for b in triple_numbers:
-            for c in triple_numbers:
-                words_a = number_to_words(a)
-                words_b = number_to_words(b)
-                words_c = number_to_words(c)
-                add_phrase(f"{words_a} plus {words_b} minus {words_c}")
-                add_phrase(f"{words_a} plus {words_b} times {words_c}")
-                add_phrase(f"{words_a} minus {words_b} divided by {words_c}")
-                add_phrase(f"open bracket {words_a} plus {words_b} close bracket times {words_c}")
-                add_phrase(f"open bracket {words_a} minus {words_b} close bracket divided by {words_c}")
-                add_phrase(f"{a} + {b} - {c}")
-                add_phrase(f"({a} + {b}) * {c}")
-                add_phrase(f"({a} - {b}) / {c}")
-                add_phrase(f"{words_a} plus {words_b} whole divide by {words_c}")
-                add_phrase(f"{words_a} plus {words_b} whole multiply by {words_c}")
-
-    for a in numbers[:12]:
-        for b in numbers[:12]:
-            for c in numbers[:12]:
-                words_a = number_to_words(a)
-                words_b = number_to_words(b)
-                words_c = number_to_words(c)
-                add_phrase(f"open parenthesis {words_a} plus {words_b} close parenthesis times {words_c}")
-                add_phrase(f"{words_a} plus open bracket {words_b} times {words_c} close bracket")
-
-    return list(phrases.values())
+    words = {n: number_to_words(n) for n in set(numbers) | set(modulus_numbers) | set(range(2, 12))}
+    # Generated phrases are already lower-case and trimmed, so an insertion-ordered
+    # dict is enough to de-duplicate them.
+    phrases: Dict[str, None] = {}
+    add_phrase = phrases.setdefault
+
+    for a, b in itertools.product(numbers, repeat=2):
+        wa, wb = words[a], words[b]
+        add_phrase(f"{wa} plus {wb}")
+        add_phrase(f"add {wa} to {wb}")
+        add_phrase(f"sum of {wa} and {wb}")
+        add_phrase(f"{wa} minus {wb}")
+        add_phrase(f"subtract {wb} from {wa}")
+        add_phrase(f"take away {wb} from {wa}")
+        add_phrase(f"{wa} times {wb}")
+        add_phrase(f"{wa} multiply by {wb}")
+        add_phrase(f"product of {wa} and {wb}")
+        add_phrase(f"{wa} divided by {wb}")
+        add_phrase(f"divide {wa} by {wb}")
+        add_phrase(f"{wa} over {wb}")
+        add_phrase(f"{wa} mod {wb}")
+        add_phrase(f"modulus of {wa} and {wb}")
+        add_phrase(f"{a} + {b}")
+        add_phrase(f"{a} - {b}")
+        add_phrase(f"{a} * {b}")
+        add_phrase(f"{a} / {b}")
+
+    for a, b in itertools.product(modulus_numbers, range(2, 12)):
+        wa, wb = words[a], words[b]
+        add_phrase(f"remainder when {wa} is divided by {wb}")
+        add_phrase(f"what's the remainder if {wa} is divided by {wb}")
+        add_phrase(f"{a} % {b}")
+
+    for a, b, c in itertools.product(triple_numbers, repeat=3):
+        wa, wb, wc = words[a], words[b], words[c]
+        add_phrase(f"{wa} plus {wb} minus {wc}")
+        add_phrase(f"{wa} plus {wb} times {wc}")
+        add_phrase(f"{wa} minus {wb} divided by {wc}")
+        add_phrase(f"open bracket {wa} plus {wb} close bracket times {wc}")
+        add_phrase(f"open bracket {wa} minus {wb} close bracket divided by {wc}")
+        add_phrase(f"{a} + {b} - {c}")
+        add_phrase(f"({a} + {b}) * {c}")
+        add_phrase(f"({a} - {b}) / {c}")
+        add_phrase(f"{wa} plus {wb} whole divide by {wc}")
+        add_phrase(f"{wa} plus {wb} whole multiply by {wc}")
+
+    for a, b, c in itertools.product(numbers[:12], repeat=3):
+        wa, wb, wc = words[a], words[b], words[c]
+        add_phrase(f"open parenthesis {wa} plus {wb} close parenthesis times {wc}")
+        add_phrase(f"{wa} plus open bracket {wb} times {wc} close bracket")
+
+    return tuple({"text": text, "label": "expression"} for text in phrases)
 
 
 def _ensure_dataset() -> List[Dict[str, str]]:
     """Guarantee that a dataset file exists and return its parsed content."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     if not DATA_FILE.exists():
-        DATA_FILE.write_text(json.dumps(DEFAULT_DATASET, indent=2), encoding="utf-8")
+        _write_json(DATA_FILE, DEFAULT_DATASET)
+    if orjson is not None:
+        return orjson.loads(DATA_FILE.read_bytes())
     with DATA_FILE.open("r", encoding="utf-8") as handle:
         return json.load(handle)
 
 
+def _write_json(path: Path, records: List[Dict[str, str]]) -> None:
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(records, indent=2), encoding="utf-8")
+
+
 def load_dataset() -> List[Dict[str, str]]:
     """Load the dataset from disk (ensuring defaults if missing)."""
     return _ensure_dataset()
@@ -259,7 +260,7 @@ def save_dataset(records: Iterable[Dict[str, str]]) -> None:
     """Persist the dataset back to disk."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     serialisable = list(records)
-    DATA_FILE.write_text(json.dumps(serialisable, indent=2), encoding="utf-8")
+    _write_json(DATA_FILE, serialisable)
 
 
 def train_pipeline(records: Iterable[Dict[str, str]], persist: bool = True) -> Pipeline:
@@ -268,7 +269,7 @@ def train_pipeline(records: Iterable[Dict[str, str]], persist: bool = True) -> P
     synthetic_records = synthetic_expression_corpus()
 
     merged: Dict[str, Dict[str, str]] = {}
-    for entry in list(records_list) + synthetic_records:
+    for entry in itertools.chain(records_list, synthetic_records):
         text = entry["text"].strip()
         if not text:
             continue
@@ -284,28 +285,37 @@ def train_pipeline(records: Iterable[Dict[str, str]], persist: bool = True) -> P
     labels = [row["label"] for row in records_list]
 
     pipeline = Pipeline([
-        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), min_df=1)),
-        ("clf", LogisticRegression(max_iter=400, multi_class="auto")),
+        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), min_df=1, dtype=np.float32)),
+        ("clf", LinearSVC(C=1.0, dual="auto")),
     ])
     pipeline.fit(texts, labels)
 
     if persist:
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        joblib.dump(pipeline, MODEL_FILE)
+        with _MODEL_FILE_LOCK:
+            _save_pipeline(pipeline)
 
     return pipeline
 
 
+def _save_pipeline(pipeline: Pipeline) -> None:
+    """Write the model next to MODEL_FILE and swap it in; call with _MODEL_FILE_LOCK held."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    # An interrupted dump leaves only the temporary file behind, never a
+    # truncated model.
+    partial = MODEL_FILE.with_name(MODEL_FILE.name + ".tmp")
+    joblib.dump(pipeline, partial, compress=0)
+    os.replace(partial, MODEL_FILE)
+
+
 def _load_pipeline() -> Pipeline:
     """Load a persisted pipeline or fall back to training one."""
-    dataset = _ensure_dataset()
     if MODEL_FILE.exists():
         try:
             return joblib.load(MODEL_FILE)
         except Exception:
             # Fall back to retraining if the cached model is incompatible.
             pass
-    return train_pipeline(dataset, persist=True)
+    return train_pipeline(_ensure_dataset(), persist=True)
 
 
 # === Normalisation helpers ===================================================
@@ -410,105 +420,173 @@ FILLER_WORDS = {
     "per",
 }
 
+# Common multi-word phrases normalised before tokenisation.
+_PHRASE_MAP: Dict[str, str] = {
+    "divided by": "divide",
+    "multiplied by": "multiply",
+    "times by": "multiply",
+    "multiply by": "multiply",
+    "multiply with": "multiply",
+    "multiplied with": "multiply",
+    "divide by": "divide",
+    "divided into": "divide",
+    "whole multiplied by": "whole multiply",
+    "whole multiply by": "whole multiply",
+    "whole divided by": "whole divide",
+    "to the power of": "power",
+    "raised to": "power",
+    "open bracket": "open bracket",
+    "open parenthesis": "open parenthesis",
+    "left bracket": "open bracket",
+    "left parenthesis": "open parenthesis",
+    "close bracket": "close bracket",
+    "close parenthesis": "close parenthesis",
+    "right bracket": "close bracket",
+    "right parenthesis": "close parenthesis",
+}
+# Longest phrases first so e.g. "whole multiply by" wins over "multiply by".
+_PHRASE_RE = re.compile("|".join(re.escape(phrase) for phrase in sorted(_PHRASE_MAP, key=len, reverse=True)))
 
-def _collapse_number_sequence(words: List[str]) -> Optional[int]:
-    """Convert a consecutive sequence of number words into an integer."""
-    if not words:
-        return None
-
-    total = 0
-    current = 0
-    for word in words:
-        value = NUMBER_WORDS.get(word)
-        if value is None:
-            return None
-        if value == 100:
-            if current == 0:
-                current = 1
-            current *= 100
-        else:
-            current += value
-    total += current
-    return total
 
+def _replace_phrase(match: re.Match[str]) -> str:
+    return _PHRASE_MAP[match.group(0)]
 
-def _tokenise_transcript(transcript: str) -> List[str]:
-    cleaned = transcript.lower().strip()
+
+# Verb-first phrasings rewritten into infix form. Applied in order because a
+# later rule may need to see the output of an earlier one.
+_REWRITE_RULES: Tuple[Tuple[re.Pattern[str], str], ...] = (
+    (re.compile(r"remainder when ([a-z0-9 ]+?) is divided by ([a-z0-9 ]+)"), r"\1 mod \2"),
+    (re.compile(r"what's the remainder if ([a-z0-9 ]+?) is divided by ([a-z0-9 ]+)"), r"\1 mod \2"),
+    (re.compile(r"subtract ([a-z0-9 ]+?) from ([a-z0-9 ]+)"), r"\2 minus \1"),
+    (re.compile(r"take away ([a-z0-9 ]+?) from ([a-z0-9 ]+)"), r"\2 minus \1"),
+    (re.compile(r"add ([a-z0-9 ]+?) to ([a-z0-9 ]+)"), r"\2 plus \1"),
+    (re.compile(r"sum of ([a-z0-9 ]+?) and ([a-z0-9 ]+)"), r"\1 plus \2"),
+    (re.compile(r"difference between ([a-z0-9 ]+?) and ([a-z0-9 ]+)"), r"\1 minus \2"),
+)
+_TOKEN_RE = re.compile(r"[a-zA-Z]+|\d+|[+\-*/()=%]")
+
+# Token classes for normalise_expression. Tokens that appear in several word
+# lists keep the class of the check the loop used to make first, e.g. "into"
+# is a filler rather than an operator and "is" a filler rather than "=".
+_FILLER, _WRAP, _OPERATOR, _PAREN, _BRACKET, _SPECIAL = range(6)
+_TOKEN_CLASS: Dict[str, Tuple[int, str]] = {}
+for _cls, _table in (
+    (_SPECIAL, SPECIAL_TOKENS),
+    (_BRACKET, {word: word for word in BRACKET_WORDS}),
+    (_PAREN, {"(": "(", ")": ")"}),
+    (_OPERATOR, OPERATOR_WORDS),
+    (_WRAP, {word: word for word in ("whole", "entire", "all")}),
+    (_FILLER, {word: word for word in FILLER_WORDS}),
+):
+    _TOKEN_CLASS.update((word, (_cls, payload)) for word, payload in _table.items())
+del _cls, _table
+_UNCLASSIFIED: Tuple[None, str] = (None, "")
+_OPERATOR_SYMBOLS = frozenset(OPERATOR_WORDS.values())
+# Words that say which way the following "bracket" faces.
+_OPENING_WORDS = frozenset({"open", "opening", "left"})
+_CLOSING_WORDS = frozenset({"close", "closing", "right"})
+# Words that end a run of number words.
+_NUMBER_BREAK_WORDS = frozenset(OPERATOR_WORDS) | frozenset(SPECIAL_TOKENS)
+# Final clean-up of a built expression: drop anything the calculator cannot
+# evaluate (including "="), then squash runs of operators to the last one
+# spoken and runs of dots to a single dot.
+_DISALLOWED_CHAR_RE = re.compile(r"[^0-9+\-*/().]")
+_REPEATED_SYMBOL_RE = re.compile(r"[+\-*/]{2,}|\.{2,}")
+_ARITHMETIC_RE = re.compile(r"[+\-*/]")
+# Normaliser confidence above which an expression containing an operator is
+# taken as-is without consulting the classifier.
+EXPRESSION_SHORTCUT_CONFIDENCE = 0.9
+# "equal" also covers "equals".
+_CALC_TRIGGER_RE = re.compile(r"equal|result|calculate")
+
+
+def _last_char(match: re.Match[str]) -> str:
+    return match.group(0)[-1]
+
+
+def _tokenise_transcript(transcript: str) -> Tuple[str, List[str]]:
+    """Return the lowered transcript alongside its calculator tokens."""
+    lowered = transcript.lower().strip()
     # Normalise common multi-word phrases before tokenisation.
-    phrase_map = {
-        "divided by": "divide",
-        "multiplied by": "multiply",
-        "times by": "multiply",
-        "multiply by": "multiply",
-        "multiply with": "multiply",
-        "multiplied with": "multiply",
-        "divide by": "divide",
-        "divided into": "divide",
-        "whole multiplied by": "whole multiply",
-        "whole multiply by": "whole multiply",
-        "whole divided by": "whole divide",
-        "to the power of": "power",
-        "raised to": "power",
-        "open bracket": "open bracket",
-        "open parenthesis": "open parenthesis",
-        "left bracket": "open bracket",
-        "left parenthesis": "open parenthesis",
-        "close bracket": "close bracket",
-        "close parenthesis": "close parenthesis",
-        "right bracket": "close bracket",
-        "right parenthesis": "close parenthesis",
-    }
-    for phrase, replacement in phrase_map.items():
-        cleaned = cleaned.replace(phrase, replacement)
-
-    cleaned = re.sub(r"remainder when ([a-z0-9 ]+?) is divided by ([a-z0-9 ]+)", r"\1 mod \2", cleaned)
-    cleaned = re.sub(r"what's the remainder if ([a-z0-9 ]+?) is divided by ([a-z0-9 ]+)", r"\1 mod \2", cleaned)
-    cleaned = re.sub(r"subtract ([a-z0-9 ]+?) from ([a-z0-9 ]+)", r"\2 minus \1", cleaned)
-    cleaned = re.sub(r"take away ([a-z0-9 ]+?) from ([a-z0-9 ]+)", r"\2 minus \1", cleaned)
-    cleaned = re.sub(r"add ([a-z0-9 ]+?) to ([a-z0-9 ]+)", r"\2 plus \1", cleaned)
-    cleaned = re.sub(r"sum of ([a-z0-9 ]+?) and ([a-z0-9 ]+)", r"\1 plus \2", cleaned)
-    cleaned = re.sub(r"difference between ([a-z0-9 ]+?) and ([a-z0-9 ]+)", r"\1 minus \2", cleaned)
-
-    tokens = re.findall(r"[a-zA-Z]+|\d+|[+\-*/()=%]", cleaned)
-    return tokens
+    cleaned = _PHRASE_RE.sub(_replace_phrase, lowered)
+
+    for pattern, replacement in _REWRITE_RULES:
+        cleaned = pattern.sub(replacement, cleaned)
+
+    return lowered, _TOKEN_RE.findall(cleaned)
 
 
 def normalise_expression(transcript: str) -> Tuple[Optional[str], float]:
     """Convert free-form spoken math into a calculator-friendly expression."""
-    tokens = _tokenise_transcript(transcript)
+    return _parse_transcript(transcript)[1:]
+
+
+# Voice sessions repeat the same short commands a lot, and parsing depends
+# only on the transcript, so recent results are memoised.
+@functools.lru_cache(maxsize=256)
+def _parse_transcript(transcript: str) -> Tuple[str, Optional[str], float]:
+    lowered, tokens = _tokenise_transcript(transcript)
+    return (lowered, *_normalise_tokens(tokens))
+
+
+def _normalise_tokens(tokens: List[str]) -> Tuple[Optional[str], float]:
     if not tokens:
         return None, 0.0
 
     builder: List[str] = []
-    buffer: List[str] = []
     matches = 0
     wrap_before_next_operator = False
     pending_operator: Optional[str] = None
+    # Running value of the current run of number words, accumulated as each
+    # word arrives; None once the run contains a word that is not a number.
+    run_value: Optional[int] = 0
+    run_length = 0
+
+    classify = _TOKEN_CLASS.get
+    number_value = NUMBER_WORDS.get
+    last_index = len(tokens) - 1
+    for i, token in enumerate(tokens):
+        cls, payload = classify(token, _UNCLASSIFIED)
+        if cls is None:
+            # Most tokens are digits or number words, so test them first.
+            if token.isdigit():
+                builder.append(token)
+                matches += 1
+                run_value, run_length = 0, 0
+                if pending_operator:
+                    builder.append(pending_operator)
+                    pending_operator = None
+                continue
 
-    i = 0
-    while i < len(tokens):
-        token = tokens[i]
-
-        if token in FILLER_WORDS:
-            matches += 1
-            buffer.clear()
-            i += 1
+            if run_value is not None:
+                value = number_value(token)
+                if value is None:
+                    run_value = None
+                elif value == 100:
+                    run_value = (run_value or 1) * 100
+                else:
+                    run_value += value
+            run_length += 1
+            next_token = tokens[i + 1] if i < last_index else None
+            if next_token is None or next_token in _NUMBER_BREAK_WORDS or next_token.isdigit():
+                if run_value is not None:
+                    builder.append(str(run_value))
+                    matches += run_length
+                    if pending_operator:
+                        builder.append(pending_operator)
+                        pending_operator = None
+                run_value, run_length = 0, 0
             continue
 
-        if token in {"whole", "entire", "all"}:
+        # Any recognised word ends the current run of number words.
+        run_value, run_length = 0, 0
+        # Fillers only count towards the match ratio.
+        matches += 1
+        if cls == _WRAP:
             wrap_before_next_operator = True
-            matches += 1
-            buffer.clear()
-            i += 1
-            continue
-
-        if token in OPERATOR_WORDS:
-            operator_symbol = OPERATOR_WORDS[token]
-            if not builder or builder[-1] in OPERATOR_WORDS.values():
-                pending_operator = operator_symbol
-                matches += 1
-                buffer.clear()
-                i += 1
+        elif cls == _OPERATOR:
+            if not builder or builder[-1] in _OPERATOR_SYMBOLS:
+                pending_operator = payload
                 continue
 
             if wrap_before_next_operator and builder:
@@ -517,62 +595,26 @@ def normalise_expression(transcript: str) -> Tuple[Optional[str], float]:
                 if builder[-1] != ")":
                     builder.append(")")
                 wrap_before_next_operator = False
-            builder.append(operator_symbol)
-            matches += 1
-            buffer.clear()
-        elif token in {"(", ")"}:
+            builder.append(payload)
+        elif cls == _PAREN:
             builder.append(token)
-            matches += 1
-            buffer.clear()
-        elif token in BRACKET_WORDS:
+        elif cls == _BRACKET:
             prev = tokens[i - 1] if i > 0 else ""
-            if prev in {"open", "opening", "left"}:
+            if prev in _OPENING_WORDS:
                 # The preceding token already inserted an opening bracket, so skip.
-                matches += 1
-            elif prev in {"close", "closing", "right"}:
+                pass
+            elif prev in _CLOSING_WORDS:
                 builder.append(")")
-                matches += 1
             else:
                 builder.append("(")
-                matches += 1
-            buffer.clear()
-        elif token in SPECIAL_TOKENS:
-            mapped = SPECIAL_TOKENS[token]
-            if mapped == "()":
+        elif cls == _SPECIAL:
+            if payload == "()":
                 prev = tokens[i - 1] if i > 0 else ""
-                mapped = ")" if prev in {"close", "closing", "right"} else "("
-            builder.append(mapped)
-            matches += 1
-            buffer.clear()
-        elif token.isdigit():
-            builder.append(token)
-            matches += 1
-            buffer.clear()
-            if pending_operator:
-                builder.append(pending_operator)
-                pending_operator = None
-        else:
-            buffer.append(token)
-            next_token = tokens[i + 1] if i + 1 < len(tokens) else None
-            sequence = buffer[:]
-            if next_token is None or next_token in OPERATOR_WORDS or next_token in SPECIAL_TOKENS or next_token.isdigit():
-                number_value = _collapse_number_sequence(sequence)
-                if number_value is not None:
-                    builder.append(str(number_value))
-                    matches += len(sequence)
-                    buffer.clear()
-                    if pending_operator:
-                        builder.append(pending_operator)
-                        pending_operator = None
-                else:
-                    buffer.clear()
-        i += 1
-
-    expression = ''.join(builder)
-    expression = re.sub(r"[^0-9+\-*/().=]", "", expression)
-    expression = expression.replace("=", "")
-    expression = re.sub(r"([+\-*/]){2,}", r"\\1", expression)
-    expression = re.sub(r"\.{2,}", ".", expression)
+                payload = ")" if prev in _CLOSING_WORDS else "("
+            builder.append(payload)
+
+    expression = _DISALLOWED_CHAR_RE.sub("", ''.join(builder))
+    expression = _REPEATED_SYMBOL_RE.sub(_last_char, expression)
     expression = expression.rstrip("+-*/%")
 
     confidence = matches / len(tokens)
@@ -582,6 +624,119 @@ def normalise_expression(transcript: str) -> Tuple[Optional[str], float]:
     return expression, min(1.0, confidence)
 
 
+class _SingleDocTfidf:
+    """Featurise one transcript straight from a fitted TfidfVectorizer.
+
+    Produces the same (indices, values) as ``vectoriser.transform([text])`` but
+    skips the per-call validation and sparse-matrix construction, which
+    dominate the cost of transforming a single short utterance.
+    """
+
+    def __init__(self, vectoriser: TfidfVectorizer) -> None:
+        self._analyse = vectoriser.build_analyzer()
+        self._vocabulary = vectoriser.vocabulary_
+        self._idf = vectoriser.idf_.astype(np.float32) if vectoriser.use_idf else None
+        self._binary = vectoriser.binary
+        self._sublinear = vectoriser.sublinear_tf
+        self._norm = vectoriser.norm
+
+    @staticmethod
+    def supports(step: object) -> bool:
+        return isinstance(step, TfidfVectorizer) and step.norm in ("l1", "l2", None)
+
+    def transform(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        vocabulary = self._vocabulary
+        counts: Dict[int, int] = {}
+        for term in self._analyse(text):
+            idx = vocabulary.get(term)
+            if idx is not None:
+                counts[idx] = counts.get(idx, 0) + 1
+
+        indices = np.fromiter(counts, dtype=np.intp, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        if self._binary:
+            values.fill(1.0)
+        elif self._sublinear:
+            np.log(values, out=values)
+            values += 1.0
+        if self._idf is not None:
+            values *= self._idf[indices]
+        if self._norm is not None and values.size:
+            norm = np.sqrt(np.dot(values, values)) if self._norm == "l2" else np.abs(values).sum()
+            if norm:
+                values /= norm
+        return indices, values
+
+
+def _rule_based_intent(parsed: Tuple[Optional[str], float]) -> Tuple[str, float]:
+    """Stand-in for the classifier while the model is still training."""
+    expression, expression_confidence = parsed
+    if expression:
+        return "expression", expression_confidence
+    return "noop", 0.0
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    """Turn per-class decision scores into a probability-like confidence vector."""
+    scores = np.atleast_1d(np.asarray(scores, dtype=np.float64))
+    if scores.size == 1:
+        # Binary models report a single margin for the positive class.
+        scores = np.array([0.0, scores[0]])
+    exp = np.exp(scores - scores.max())
+    return exp / exp.sum()
+
+
+class _Scorer:
+    """A fitted pipeline and the scoring data derived from it.
+
+    Built in full before IntentClassifier publishes it with one assignment, so
+    a prediction racing a retrain uses one model throughout and never pairs the
+    old vocabulary with the new weights.
+    """
+
+    def __init__(self, pipeline: Pipeline) -> None:
+        self.pipeline = pipeline
+        # Cache the linear weights so single utterances can be scored with a
+        # sparse column gather instead of a dense matrix product.
+        clf = pipeline[-1]
+        coef = getattr(clf, "coef_", None)
+        self._vectoriser: Optional[Pipeline] = None
+        self._coef: Optional[np.ndarray] = None
+        self._intercept: Optional[np.ndarray] = None
+        if isinstance(coef, np.ndarray) and len(pipeline) > 1:
+            self._vectoriser = pipeline[:-1]
+            # float32 matches the vectoriser output and halves the bytes gathered per utterance.
+            self._coef = coef.astype(np.float32)
+            self._intercept = np.asarray(clf.intercept_, dtype=np.float32)
+        self._single_doc: Optional[_SingleDocTfidf] = None
+        if self._coef is not None and len(pipeline) == 2 and _SingleDocTfidf.supports(pipeline[0]):
+            self._single_doc = _SingleDocTfidf(pipeline[0])
+        # Per scorer rather than cleared on retrain, so a prediction that
+        # finishes after a swap can only fill the discarded scorer's cache.
+        self.predict_cached = functools.lru_cache(maxsize=256)(self.predict)
+
+    def decision_scores(self, text: str) -> np.ndarray:
+        if self._single_doc is not None:
+            indices, values = self._single_doc.transform(text)
+            return self._coef[:, indices] @ values + self._intercept
+        if self._coef is not None:
+            features = self._vectoriser.transform([text])
+            if hasattr(features, "indices"):
+                # Only the columns of the few non-zero features contribute to the scores.
+                return self._coef[:, features.indices] @ features.data + self._intercept
+        return self.pipeline.decision_function([text])[0]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        if not text:
+            return "noop", 0.0
+        pipeline = self.pipeline
+        if hasattr(pipeline, "decision_function"):
+            probabilities = _softmax(self.decision_scores(text))
+            idx = int(probabilities.argmax())
+            return pipeline.classes_[idx], float(probabilities[idx])
+        return pipeline.predict([text])[0], 1.0
+
+
 @dataclass
 class IntentResult:
     raw: str
@@ -593,32 +748,94 @@ class IntentResult:
 
 
 class IntentClassifier:
-    """Bundle classifier + normalisation used by the voice service."""
+    """Bundle classifier + normalisation used by the voice service.
+
+    The dataset and pipeline are loaded on first access, so constructing the
+    classifier is cheap until a transcript actually needs classifying. When no
+    trained model is on disk, training starts in the background straight away
+    and transcripts fall back to the rule-based normaliser until it finishes.
+    """
 
     def __init__(self) -> None:
-        self.dataset = _ensure_dataset()
-        self.pipeline = _load_pipeline()
+        # Replaced as a whole when the pipeline changes; read once per prediction.
+        self._scorer: Optional[_Scorer] = None
+        # Bumped under _MODEL_FILE_LOCK whenever a pipeline is assigned or a
+        # retrain starts, so a slower background fit is never saved over it.
+        self._generation = 0
+        self._training: Optional[Future[Pipeline]] = None
+        if not MODEL_FILE.exists():
+            self._training = Future()
+            threading.Thread(target=self._train_in_background, args=(self._generation,), daemon=True).start()
+
+    def _train_in_background(self, generation: int) -> None:
+        try:
+            pipeline = train_pipeline(_ensure_dataset(), persist=False)
+            with _MODEL_FILE_LOCK:
+                if generation == self._generation:
+                    _save_pipeline(pipeline)
+        except BaseException as exc:
+            self._training.set_exception(exc)
+        else:
+            self._training.set_result(pipeline)
+
+    def _model_pending(self) -> bool:
+        training = self._training
+        return self._scorer is None and training is not None and not training.done()
+
+    @cached_property
+    def dataset(self) -> List[Dict[str, str]]:
+        return _ensure_dataset()
+
+    def _current_scorer(self) -> _Scorer:
+        scorer = self._scorer
+        if scorer is None:
+            if self._training is not None:
+                pipeline = self._training.result()
+                with _MODEL_FILE_LOCK:
+                    # A pipeline assigned while we waited is newer; keep it.
+                    if self._scorer is None:
+                        self._scorer = _Scorer(pipeline)
+            else:
+                self.pipeline = _load_pipeline()
+            scorer = self._scorer
+        return scorer
 
-    def predict_intent(self, transcript: str) -> Tuple[str, float]:
-        cleaned = transcript.strip()
-        if not cleaned:
-            return "noop", 0.0
+    @property
+    def pipeline(self) -> Pipeline:
+        return self._current_scorer().pipeline
 
-        if hasattr(self.pipeline, "predict_proba"):
-            probabilities = self.pipeline.predict_proba([cleaned])[0]
-            idx = int(probabilities.argmax())
-            label = self.pipeline.classes_[idx]
-            return label, float(probabilities[idx])
+    @pipeline.setter
+    def pipeline(self, pipeline: Pipeline) -> None:
+        scorer = _Scorer(pipeline)
+        with _MODEL_FILE_LOCK:
+            self._generation += 1
+            self._scorer = scorer
 
-        label = self.pipeline.predict([cleaned])[0]
-        return label, 1.0
+    def predict_intent(self, transcript: str) -> Tuple[str, float]:
+        if self._model_pending():
+            return _rule_based_intent(normalise_expression(transcript))
+        return self._predict_cached(transcript.strip())
+
+    def _predict_cached(self, cleaned: str) -> Tuple[str, float]:
+        return self._current_scorer().predict_cached(cleaned)
 
     def interpret(self, transcript: str) -> IntentResult:
-        label, confidence = self.predict_intent(transcript)
-        expression, expression_confidence = normalise_expression(transcript)
+        # The vectoriser lowercases anyway, so the lowered text can be shared
+        # between the classifier, the normaliser and the trigger check.
+        lowered, expression, expression_confidence = _parse_transcript(transcript)
+        if (
+            expression
+            and expression_confidence >= EXPRESSION_SHORTCUT_CONFIDENCE
+            and _ARITHMETIC_RE.search(expression)
+        ):
+            # Plain arithmetic is fully handled by the normaliser.
+            label, confidence = "expression", expression_confidence
+        elif self._model_pending():
+            label, confidence = _rule_based_intent((expression, expression_confidence))
+        else:
+            label, confidence = self._predict_cached(lowered)
 
-        lowered = transcript.lower()
-        if any(trigger in lowered for trigger in ("equals", "equal", "result", "calculate")):
+        if _CALC_TRIGGER_RE.search(lowered):
             label = "calculate"
             confidence = max(confidence, 0.6)
 
@@ -654,8 +871,19 @@ class IntentClassifier:
         self.dataset.append(sample)
         save_dataset(self.dataset)
 
-    def retrain(self) -> None:
-        self.pipeline = train_pipeline(self.dataset, persist=True)
+    def retrain(self, records: Optional[Iterable[Dict[str, str]]] = None) -> None:
+        """Train on ``records`` (default: the dataset), save and start using the result."""
+        with _MODEL_FILE_LOCK:
+            # Waits out a background save already under way and stops any
+            # later one, so only this model ends up on disk.
+            self._generation += 1
+        self.pipeline = train_pipeline(self.dataset if records is None else records, persist=True)
+
+    def warm_up(self) -> None:
+        """Score the dataset's command phrases so spoken commands hit the cache."""
+        for sample in self.dataset:
+            if sample["label"] != "expression":
+                self.interpret(sample["text"])
 
 
 async def stream_intent_results(queue: "asyncio.Queue[IntentResult]"):
@@ -0,0 +1,19 @@
+"""Intent labels shared by the voice service and trainer UI.
+
+Kept free of heavy dependencies so callers can import the labels without
+pulling in scikit-learn.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+# Public list of supported intents; used by both the voice service and trainer UI.
+INTENT_LABELS: Tuple[str, ...] = (
+    "expression",
+    "calculate",
+    "clear",
+    "backspace",
+    "stop",
+    "noop",
+)
@@ -10,36 +10,106 @@ Usage:
 Dependencies:
     pip install fastapi uvicorn[standard] speechrecognition pyaudio scikit-learn joblib
 
-Ensure you have a working microphone and (for the default recognizer) an active
-internet connection. The recognizer leverages Google Web Speech. You can swap in
-an offline engine like Vosk inside the `_transcribe_audio` method if desired.
+Ensure you have a working microphone. Speech is transcribed offline with Vosk
+when it is installed and a model is available at VOSK_MODEL_PATH; otherwise, or
+with VOICE_BACKEND=google, Google Web Speech is used, which needs an active
+internet connection.
 """
 
 from __future__ import annotations
 
-import array
 import asyncio
+import collections
+import http.client
 import json
-import math
+import queue
 import threading
 import time
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, List, Optional
+from urllib.parse import urlsplit
 
+import numpy as np
 import speech_recognition as sr
+from speech_recognition.recognizers import google as google_speech
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 
+from ml.dsp_kernels import rms
 from ml.intent_classifier import INTENT_LABELS, IntentClassifier
 import os
 
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+except ImportError:  # orjson is optional; fall back to the stdlib encoder.
+
+    def _dumps(payload: Dict[str, Any]) -> bytes:
+        return json.dumps(payload).encode()
+
 DEFAULT_HOST = os.getenv("VOICE_HOST", "127.0.0.1")
 DEFAULT_PORT = int(os.getenv("VOICE_PORT", "8000"))
+VOICE_BACKEND = os.getenv("VOICE_BACKEND", "vosk").lower()
+VOSK_MODEL_PATH = Path(
+    os.getenv("VOSK_MODEL_PATH", Path(__file__).resolve().parent / "models" / "vosk-model-small-en-us-0.15")
+)
+# Request format and response parsing of Recognizer.recognize_google; only the
+# transport differs here.
+_GOOGLE_REQUEST = google_speech.create_request_builder(endpoint=google_speech.ENDPOINT)
+_GOOGLE_OUTPUT = google_speech.OutputParser(show_all=False, with_confidence=False)
+# Raised when the server closed an idle keep-alive connection.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+# Captured phrases waiting for transcription.
+AUDIO_QUEUE_SIZE = 4
+PHRASE_TIME_LIMIT = 7
+# Events buffered per SSE client before its oldest ones are dropped.
+SUBSCRIBER_QUEUE_SIZE = 64
+KEEPALIVE_SECONDS = 15
+PING = b"event: ping\ndata: {}\n\n"
+# Burst of append_expression results collapsed into one event.
+APPEND_DEBOUNCE_SECONDS = 0.15
+# numpy sample type, zero offset and scale onto the 16-bit range for each PCM
+# sample width SpeechRecognition may capture. 8-bit PCM is unsigned.
+_PCM_FORMATS = {
+    1: (np.uint8, 128.0, 256.0),
+    2: (np.int16, 0.0, 1.0),
+    4: (np.int32, 0.0, 1.0 / 65536),
+}
+
+
+def _frame(payload: Dict[str, Any]) -> bytes:
+    return b"data: " + _dumps(payload) + b"\n\n"
+
+
+class _Subscriber:
+    """Frames waiting for one SSE client."""
+
+    __slots__ = ("frames", "ready")
+
+    def __init__(self) -> None:
+        # A stalled client must not hold up the others or the recognizer; once
+        # full, its oldest frames are dropped so it resumes with the latest state.
+        self.frames: Deque[bytes] = collections.deque(maxlen=SUBSCRIBER_QUEUE_SIZE)
+        self.ready = asyncio.Event()
+
+    def push(self, frame: bytes) -> None:
+        self.frames.append(frame)
+        self.ready.set()
+
+    async def drain(self) -> bytes:
+        """Wait for frames and return everything buffered as one chunk."""
+        await self.ready.wait()
+        self.ready.clear()
+        batch = b"".join(self.frames)
+        self.frames.clear()
+        return batch
 
 
 class VoiceEngine:
-    """Background recognizer that pushes structured voice intents into a queue."""
+    """Background recognizer that fans structured voice intents out to SSE clients."""
 
     def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
         self.loop = loop
@@ -54,23 +124,58 @@ class VoiceEngine:
             # but voice/start will refuse and status will report error.
             self.microphone = None  # type: ignore[assignment]
             self._mic_error = str(exc)
-        self.intent_model = IntentClassifier()
-        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        # Loaded off the event loop by load_intent_model() once the app starts.
+        self.intent_model: Optional[IntentClassifier] = None
+        # Set by load_vosk_model(); only the transcription worker uses it.
+        self._vosk_recognizer: Optional[Any] = None
+        # Kept open between phrases for Google recognition; worker thread only.
+        self._google_conn: Optional[http.client.HTTPConnection] = None
+        # Encoded SSE frames buffered per connected client.
+        self._subscribers: "set[_Subscriber]" = set()
+        self._keepalive_task = loop.create_task(self._keepalive())
         self._thread: Optional[threading.Thread] = None
+        self._worker: Optional[threading.Thread] = None
+        self._audio_queue: "Optional[queue.Queue[Optional[sr.AudioData]]]" = None
+        # Set when the current session ends; each session gets its own so a
+        # worker still finishing an old phrase cannot act on a newer session.
+        self._session_stopped = threading.Event()
+        self._stop_listener: Optional[Callable[..., None]] = None
         self._running = threading.Event()
         self._status = "idle"
         self._last_energy = 0.0
-        self._expression_buffer: List[str] = []
+        # Expressions heard within the coalescing window, space-separated.
+        self._expression_str = ""
         self._last_expression_time = 0.0
+        # Latest append_expression payload not yet sent to clients.
+        self._pending_append: Optional[Dict[str, Any]] = None
+        self._append_lock = threading.Lock()
 
     # ---------------------------------------------------------------------
     @property
     def status(self) -> str:
         return self._status
 
+    def subscribe(self) -> _Subscriber:
+        subscriber = _Subscriber()
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
     def _emit(self, payload: Dict[str, Any]) -> None:
-        """Push payloads into the async queue from any thread safely."""
-        asyncio.run_coroutine_threadsafe(self.queue.put(payload), self.loop)
+        """Publish payloads to every SSE client from any thread safely."""
+        # Encode once here, off the event loop, and share the frame between clients.
+        self.loop.call_soon_threadsafe(self._publish, _frame(payload))
+
+    def _publish(self, frame: bytes) -> None:
+        for subscriber in self._subscribers:
+            subscriber.push(frame)
+
+    async def _keepalive(self) -> None:
+        while True:
+            await asyncio.sleep(KEEPALIVE_SECONDS)
+            self._publish(PING)
 
     def _emit_status(self, message: str, level: str = "info", state: Optional[str] = None) -> None:
         payload = {
@@ -96,10 +201,26 @@ class VoiceEngine:
         self._status = "calibrating"
         self._emit_status("Calibrating microphone…", state=self._status)
 
-        self._thread = threading.Thread(target=self._run, name="VoiceEngine", daemon=True)
+        # Phrases captured by the background listener are transcribed on a worker
+        # thread, so the next phrase can be recorded while the previous one is out
+        # for recognition. A single worker keeps results in the order they were spoken.
+        audio_queue: "queue.Queue[Optional[sr.AudioData]]" = queue.Queue(maxsize=AUDIO_QUEUE_SIZE)
+        stopped = threading.Event()
+        previous = (self._thread, self._worker)
+        self._audio_queue = audio_queue
+        self._session_stopped = stopped
+        self._worker = threading.Thread(
+            target=self._process_audio, args=(audio_queue, stopped), name="VoiceEngineWorker", daemon=True
+        )
+        self._thread = threading.Thread(
+            target=self._run, args=(audio_queue, stopped, self._worker, previous), name="VoiceEngine", daemon=True
+        )
         self._thread.start()
 
-    def stop(self) -> None:
+    def stop(self, session: Optional[threading.Event] = None) -> None:
+        """Stop capturing; a worker passes its session so it can only end its own."""
+        if session is not None and session.is_set():
+            return
         if not self._running.is_set():
             self._status = "idle"
             self._emit_status("Voice capture idle", state=self._status)
@@ -108,90 +229,250 @@ class VoiceEngine:
         self._running.clear()
         self._status = "stopping"
         self._emit_status("Stopping microphone stream…", state=self._status)
-        if self._thread and self._thread.is_alive():
+        # Only waits while the microphone is still being calibrated. The worker
+        # calls stop() itself on a "stop" intent or a service error.
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
             self._thread.join(timeout=3)
+        if self._stop_listener is not None:
+            # Returns at once; the listener exits after its current one-second slice.
+            self._stop_listener(wait_for_stop=False)
+        self._end_session()
         self._status = "idle"
         self._emit_status("Voice capture stopped", state=self._status)
 
+    def _end_session(self) -> None:
+        """Tell the current worker to exit; anything still queued is stale."""
+        self._session_stopped.set()
+        audio_queue = self._audio_queue
+        if audio_queue is None:
+            return
+        while True:
+            try:
+                audio_queue.get_nowait()
+            except queue.Empty:
+                break
+        while True:
+            try:
+                audio_queue.put_nowait(None)
+                return
+            except queue.Full:
+                try:
+                    audio_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
     # ------------------------------------------------------------------
-    def _run(self) -> None:
+    def _run(
+        self,
+        audio_queue: "queue.Queue[Optional[sr.AudioData]]",
+        stopped: threading.Event,
+        worker: threading.Thread,
+        previous: "tuple[Optional[threading.Thread], Optional[threading.Thread]]",
+    ) -> None:
+        # The previous session's listener may still be finishing a phrase with
+        # the microphone open, and its worker may still be transcribing one;
+        # the recognizers are not shared between workers. Its _run has started
+        # that worker once it returns.
+        previous_run, previous_worker = previous
+        if previous_run is not None:
+            previous_run.join()
+        if self._stop_listener is not None:
+            self._stop_listener(wait_for_stop=True)
+            self._stop_listener = None
+        if previous_worker is not None:
+            previous_worker.join()
+        worker.start()
+
         try:
             with self.microphone as source:
-                try:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=1.5)
-                    self._status = "listening"
-                    self._emit_status("Listening for commands…", state=self._status)
-                except Exception as exc:  # Microphone or calibration failure
-                    self._status = "error"
-                    self._emit_status(f"Microphone calibration failed: {exc}", level="error", state=self._status)
-                    self._running.clear()
-                    return
-
-                while self._running.is_set():
-                    try:
-                        audio = self.recognizer.listen(source, timeout=3, phrase_time_limit=7)
-                    except sr.WaitTimeoutError:
-                        continue
-                    except Exception as exc:
-                        self._emit_status(f"Microphone error: {exc}", level="error", state="error")
-                        continue
-
-                    if not self._running.is_set():
-                        break
-
-                    if not self._is_voice_confident(audio):
-                        self._emit_status("Discarded low-energy audio", level="debug", state=self._status)
-                        continue
-
-                    transcript = self._transcribe_audio(audio)
-                    if transcript is None:
-                        continue
-
-                    result = self.intent_model.interpret(transcript)
-                    payloads = self._handle_intent_result(result)
-                    for payload in payloads:
-                        self._emit(payload)
-
-                    if any(p["action"] == "stop" for p in payloads):
-                        self.stop()
-                        break
-        finally:
-            self._status = "idle"
+                self.recognizer.adjust_for_ambient_noise(source, duration=1.5)
+        except Exception as exc:  # Microphone or calibration failure
+            self._status = "error"
+            self._emit_status(f"Microphone calibration failed: {exc}", level="error", state=self._status)
             self._running.clear()
+            self._end_session()
+            self._status = "idle"
+            return
+
+        if stopped.is_set():
+            # Stopped while calibrating.
+            return
+
+        def on_audio(recognizer: sr.Recognizer, audio: sr.AudioData) -> None:
+            self._on_audio(audio_queue, stopped, audio)
+
+        self._stop_listener = self.recognizer.listen_in_background(
+            self.microphone, on_audio, phrase_time_limit=PHRASE_TIME_LIMIT
+        )
+        self._status = "listening"
+        self._emit_status("Listening for commands…", state=self._status)
+
+    def _on_audio(
+        self,
+        audio_queue: "queue.Queue[Optional[sr.AudioData]]",
+        stopped: threading.Event,
+        audio: sr.AudioData,
+    ) -> None:
+        """Listener callback, run on SpeechRecognition's background thread."""
+        if stopped.is_set():
+            return
+
+        if not self._is_voice_confident(audio):
+            self._emit_status("Discarded low-energy audio", level="debug", state=self._status)
+            return
+
+        try:
+            audio_queue.put_nowait(audio)
+        except queue.Full:
+            # Never block the listener: it holds the microphone open.
+            self._emit_status("Transcription is falling behind; phrase dropped", level="warning", state=self._status)
+
+    def _process_audio(
+        self, audio_queue: "queue.Queue[Optional[sr.AudioData]]", stopped: threading.Event
+    ) -> None:
+        while True:
+            audio = audio_queue.get()
+            if audio is None:
+                return
+            if stopped.is_set():
+                # Drop phrases captured just before a stop.
+                continue
+
+            try:
+                transcript = self._transcribe_audio(audio)
+                if transcript is None or stopped.is_set():
+                    continue
+
+                intent_model = self.intent_model
+                if intent_model is None:
+                    self._emit_status("Intent model still loading; phrase ignored", level="warning", state=self._status)
+                    continue
+
+                result = intent_model.interpret(transcript)
+                payloads = self._handle_intent_result(result)
+            except sr.RequestError as exc:
+                self._emit_status(f"Speech service error: {exc}", level="error", state="error")
+                self.stop(stopped)
+                continue
+            except Exception as exc:
+                # Keep the worker alive for the rest of the session.
+                self._emit_status(f"Voice processing error: {exc}", level="error", state=self._status)
+                continue
+
+            for payload in payloads:
+                self._emit(payload)
+
+            if any(p["action"] == "stop" for p in payloads):
+                self.stop(stopped)
 
     def _transcribe_audio(self, audio: sr.AudioData) -> Optional[str]:
         try:
-            transcript = self.recognizer.recognize_google(audio)
+            if self._vosk_recognizer is not None:
+                transcript = self._transcribe_vosk(audio)
+            else:
+                transcript = self._transcribe_google(audio)
             return transcript.strip()
         except sr.UnknownValueError:
             self._emit_status("Could not understand audio", level="warning", state=self._status)
-        except sr.RequestError as exc:
-            self._status = "error"
-            self._emit_status(f"Speech service error: {exc}", level="error", state=self._status)
-            self.stop()
         return None
 
+    def _transcribe_vosk(self, audio: sr.AudioData) -> str:
+        recognizer = self._vosk_recognizer
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=16000, convert_width=2))
+        # FinalResult also resets the recognizer for the next phrase.
+        transcript = json.loads(recognizer.FinalResult()).get("text", "")
+        if not transcript:
+            raise sr.UnknownValueError()
+        return transcript
+
+    def _transcribe_google(self, audio: sr.AudioData) -> str:
+        # Recognizer.recognize_google over one keep-alive connection instead of
+        # a new one per phrase.
+        response_text = self._post_google(
+            _GOOGLE_REQUEST.build_url(), _GOOGLE_REQUEST.build_data(audio), _GOOGLE_REQUEST.build_headers(audio)
+        )
+        return _GOOGLE_OUTPUT.parse(response_text)
+
+    def _post_google(self, url: str, body: bytes, headers: Dict[str, str]) -> str:
+        parts = urlsplit(url)
+        path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        retried = False
+        while True:
+            conn = self._google_conn
+            if conn is None:
+                conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+                conn = self._google_conn = conn_class(parts.netloc, timeout=self.recognizer.operation_timeout)
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                response_text = response.read().decode("utf-8")
+            except (http.client.HTTPException, OSError) as exc:
+                conn.close()
+                self._google_conn = None
+                # The server may have dropped the idle connection since the
+                # last phrase; that alone is worth one retry.
+                if retried or not isinstance(exc, _STALE_CONNECTION_ERRORS):
+                    raise sr.RequestError(f"recognition connection failed: {exc}") from exc
+                retried = True
+                continue
+            if response.status != 200:
+                raise sr.RequestError(f"recognition request failed: {response.reason}")
+            return response_text
+
     def _is_voice_confident(self, audio: sr.AudioData) -> bool:
         """Simple energy gate to filter out background noise."""
-        try:
-            raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
-        except Exception:
+        # RMS does not depend on the sample rate, so read the captured PCM as-is
+        # and only rescale amplitudes to 16-bit so the threshold stays valid.
+        width = audio.sample_width
+        if width in _PCM_FORMATS:
             raw = audio.frame_data
-        if not raw:
+        else:
+            # e.g. 24-bit capture, which numpy has no dtype for: repack as 16-bit.
+            raw, width = audio.get_raw_data(convert_width=2), 2
+        dtype, offset, scale = _PCM_FORMATS[width]
+        samples = np.frombuffer(raw, dtype=dtype, count=len(raw) // width)
+        if not samples.size:
             return False
+        # listen() keeps non_speaking_duration of the pause that ended the
+        # phrase; leave it out so it doesn't dilute the energy of what was said.
+        # Phrases cut off at PHRASE_TIME_LIMIT end mid-speech and keep it all.
+        if samples.size < PHRASE_TIME_LIMIT * audio.sample_rate:
+            trailing = int(self.recognizer.non_speaking_duration * audio.sample_rate)
+            if samples.size > trailing:
+                samples = samples[: samples.size - trailing]
+
+        energy = rms(samples, offset, scale)
+        self._last_energy = energy
+        return energy > 150  # Empirically chosen threshold
 
-        samples = array.array("h", raw)
-        if not samples:
-            return False
+    # ------------------------------------------------------------------
+    def load_intent_model(self) -> None:
+        """Load and warm up the classifier; blocking, so run it in an executor."""
+        try:
+            model = IntentClassifier()
+            model.pipeline  # Wait for the persisted (or freshly trained) model.
+            model.warm_up()
+        except Exception as exc:
+            self._emit_status(f"Failed to load intent model: {exc}", level="error", state=self._status)
+            return
+        self.intent_model = model
+
+    def load_vosk_model(self) -> None:
+        """Load the offline recognizer when selected and available; blocking."""
+        if VOICE_BACKEND != "vosk" or not VOSK_MODEL_PATH.exists():
+            return
+        try:
+            from vosk import KaldiRecognizer, Model
 
-        mean_square = sum(sample * sample for sample in samples) / len(samples)
-        rms = math.sqrt(mean_square)
-        self._last_energy = rms
-        return rms > 150  # Empirically chosen threshold
+            self._vosk_recognizer = KaldiRecognizer(Model(str(VOSK_MODEL_PATH)), 16000)
+        except Exception as exc:
+            # Vosk is optional; Google Web Speech remains the fallback.
+            self._emit_status(f"Vosk unavailable, using Google Web Speech: {exc}", level="warning", state=self._status)
 
-    # ------------------------------------------------------------------
     def reload_model(self) -> None:
         self.intent_model.retrain()
+        # A new pipeline starts with an empty prediction cache.
+        self.intent_model.warm_up()
         self._emit_status("Intent model reloaded", level="info", state=self._status)
 
     # ------------------------------------------------------------------
@@ -199,8 +480,8 @@ class VoiceEngine:
         now = time.time()
         outputs: List[Dict[str, Any]] = []
 
-        def emit(action: str, expression: Optional[str]) -> None:
-            outputs.append({
+        def payload(action: str, expression: Optional[str]) -> Dict[str, Any]:
+            return {
                 "type": "result",
                 "raw": result.raw,
                 "intent": result.intent,
@@ -209,30 +490,59 @@ class VoiceEngine:
                 "expression": expression,
                 "expression_confidence": result.expression_confidence,
                 "timestamp": now,
-            })
+            }
+
+        def emit(action: str, expression: Optional[str]) -> None:
+            outputs.append(payload(action, expression))
 
         if result.action == "append_expression" and result.expression:
-            if now - self._last_expression_time > 1.5:
-                self._expression_buffer.clear()
-            self._expression_buffer.append(result.expression)
+            if self._expression_str and now - self._last_expression_time <= 1.5:
+                self._expression_str += " " + result.expression
+            else:
+                self._expression_str = result.expression
             self._last_expression_time = now
-            combined = ' '.join(self._expression_buffer)
-            emit("append_expression", combined)
-        elif result.action == "calculate":
-            combined = ' '.join(self._expression_buffer).strip()
-            self._expression_buffer.clear()
+            # Each event carries the whole combined expression, so only the
+            # latest one of a burst needs to reach the clients.
+            self._queue_append(payload("append_expression", self._expression_str))
+            return outputs
+
+        # Anything else must reach the clients after the appends heard before it.
+        outputs.extend(self._take_pending_append())
+        if result.action == "calculate":
+            combined = self._expression_str
+            self._expression_str = ""
             self._last_expression_time = 0.0
             payload_expression = combined or result.expression
             emit("calculate", payload_expression)
         else:
             if result.action in {"clear", "backspace", "stop"}:
-                self._expression_buffer.clear()
+                self._expression_str = ""
                 self._last_expression_time = 0.0
             payload_expression = None if result.action == "clear" else result.expression
             emit(result.action, payload_expression)
 
         return outputs
 
+    def _queue_append(self, payload: Dict[str, Any]) -> None:
+        with self._append_lock:
+            scheduled = self._pending_append is not None
+            self._pending_append = payload
+        if not scheduled:
+            self.loop.call_soon_threadsafe(self.loop.call_later, APPEND_DEBOUNCE_SECONDS, self._flush_append)
+
+    def _take_pending_append(self) -> List[Dict[str, Any]]:
+        with self._append_lock:
+            payload, self._pending_append = self._pending_append, None
+        return [payload] if payload is not None else []
+
+    def _flush_append(self) -> None:
+        # Runs on the loop; publishing under the lock keeps the append ahead of
+        # any result the worker emits after finding the slot already empty.
+        with self._append_lock:
+            payload, self._pending_append = self._pending_append, None
+            if payload is not None:
+                self._publish(_frame(payload))
+
 
 app = FastAPI(title="Pro Calculator Voice Service")
 app.add_middleware(
@@ -263,12 +573,28 @@ async def _startup() -> None:
     global voice_engine
     loop = asyncio.get_running_loop()
     voice_engine = VoiceEngine(loop)
+    # Not awaited: the server answers /health while the model loads, and the
+    # model-backed endpoints return 503 until it is ready.
+    loop.run_in_executor(None, voice_engine.load_intent_model)
+    loop.run_in_executor(None, voice_engine.load_vosk_model)
 
 
 @app.on_event("shutdown")
 async def _shutdown() -> None:
     if voice_engine:
         voice_engine.stop()
+        voice_engine._keepalive_task.cancel()
+
+
+def _require_intent_model() -> IntentClassifier:
+    assert voice_engine is not None
+    if voice_engine.intent_model is None:
+        raise HTTPException(status_code=503, detail={
+            "status": "error",
+            "reason": "model-loading",
+            "message": "Intent model is still loading",
+        })
+    return voice_engine.intent_model
 
 
 @app.post("/voice/start")
@@ -295,6 +621,7 @@ async def stop_voice() -> Dict[str, Any]:
 @app.post("/voice/reload-model")
 async def reload_model() -> Dict[str, Any]:
     assert voice_engine is not None
+    _require_intent_model()
     voice_engine.reload_model()
     return {"status": "model reloaded"}
 
@@ -307,6 +634,7 @@ async def voice_status() -> Dict[str, Any]:
         "supported_intents": list(INTENT_LABELS),
         "micAvailable": voice_engine.microphone is not None,
         "micError": getattr(voice_engine, "_mic_error", None),
+        "modelReady": voice_engine.intent_model is not None,
     }
 
 
@@ -316,7 +644,7 @@ async def voice_interpret(body: InterpretRequest) -> Dict[str, Any]:
     text = (body.transcript or "").strip()
     if not text:
         raise HTTPException(status_code=400, detail="Empty transcript")
-    result = voice_engine.intent_model.interpret(text)
+    result = _require_intent_model().interpret(text)
     return {
         "type": "result",
         "raw": result.raw,
@@ -337,13 +665,13 @@ async def health() -> Dict[str, Any]:
 async def voice_stream() -> StreamingResponse:
     assert voice_engine is not None
 
-    async def event_generator() -> AsyncGenerator[str, None]:
-        while True:
-            try:
-                payload = await asyncio.wait_for(voice_engine.queue.get(), timeout=20)
-                yield f"data: {json.dumps(payload)}\n\n"
-            except asyncio.TimeoutError:
-                yield "event: ping\ndata: {}\n\n"
+    async def event_generator() -> AsyncGenerator[bytes, None]:
+        subscriber = voice_engine.subscribe()
+        try:
+            while True:
+                yield await subscriber.drain()
+        finally:
+            voice_engine.unsubscribe(subscriber)
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 